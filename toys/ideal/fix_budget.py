@@ -5,11 +5,11 @@ from gi.repository import Gtk, Adw, GLib
 
 import math
 import signal
+from collections import OrderedDict
 import numpy as np
 from matplotlib.backends.backend_gtk4agg import \
     FigureCanvasGTK4Agg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
 
 
@@ -17,8 +17,31 @@ EPSILON = 0.0001
 MAX_CPM = 20
 STEP = 0.05
 BUDGET_STEP = 0.25
+SLIDER_DELAY_MS = 50
+DATA_CACHE_SIZE = 64
+# label, range and Parameters attribute of each slider in the side panel
+SLIDERS = [
+    ("Percent of auction A", 0.0, 1.0, 'percent_A'),
+    ("Total budget", 0.0, 20.0, 'total_budget'),
+    ("Sigma A value", 0.001, 5.0, 'sigmoid_A_value'),
+    ("Sigma A scale", 0.001, 2.0, 'sigmoid_A_scale'),
+    ("Sigma A offset", 0.0, 20.0, 'sigmoid_A_offset'),
+    ("Sigma B value", 0.001, 5.0, 'sigmoid_B_value'),
+    ("Sigma B scale", 0.001, 2.0, 'sigmoid_B_scale'),
+    ("Sigma B offset", 0.0, 20.0, 'sigmoid_B_offset'),
+]
+# Fixed grids the sweeps run over, read-only since they are shared
+CPM_GRID = np.arange(int(MAX_CPM / STEP)) * STEP
+BUDGET_GRID = np.arange(int(20.0 / BUDGET_STEP)) * BUDGET_STEP
+SPEND_TABLE_X = np.linspace(0.0, 100.0, 4096)
+CPM_GRID.flags.writeable = False
+BUDGET_GRID.flags.writeable = False
+SPEND_TABLE_X.flags.writeable = False
 
 class Sigmoid:
+    _prob_cache = {}   # (scale, offset) -> win probability over CPM_GRID
+    _spend_cache = {}  # (scale, offset) -> p(x)*x over SPEND_TABLE_X
+
     def __init__(self, scale, offset, value):
         self.scale = scale
         self.offset = offset
@@ -27,7 +50,77 @@ class Sigmoid:
     def get_probability(self, x):
         return 1.0/(1+math.exp(-(x-self.offset)*self.scale)) 
 
+    def get_probability_vec(self, x):
+        return 1.0/(1+np.exp(-(x-self.offset)*self.scale))
+
+    def get_probability_range(self):
+        """Win probability over CPM_GRID, shared by all sigmoids with the same shape. Do not modify."""
+        key = (self.scale, self.offset)
+        prob = Sigmoid._prob_cache.get(key)
+        if prob is None:
+            if len(Sigmoid._prob_cache) > 256:
+                Sigmoid._prob_cache.clear()
+            prob = self.get_probability_vec(CPM_GRID)
+            prob.setflags(write=False)
+            Sigmoid._prob_cache[key] = prob
+        return prob
+
     def bisect_spend_inverse(self, y):
+        # Newton on p(x)*x = y, with d/dx p(x)*x = p(x) + x*scale*p(x)*(1-p(x))
+        x = max(y, self.offset)
+        for i in range(4):
+            p = self.get_probability(x)
+            x -= (p * x - y) / (p + x * self.scale * p * (1.0 - p))
+            x = min(max(x, 0.0), 100.0)
+        if math.fabs(self.get_probability(x) * x - y) <= 0.000001:
+            return x
+        return self._bisection_spend_inverse(y)  # None when there is no such x
+
+    def spend_table(self):
+        """p(x)*x over SPEND_TABLE_X, monotone in x, shared by all sigmoids with the same shape."""
+        key = (self.scale, self.offset)
+        ys = Sigmoid._spend_cache.get(key)
+        if ys is None:
+            if len(Sigmoid._spend_cache) > 256:
+                Sigmoid._spend_cache.clear()
+            ys = self.get_probability_vec(SPEND_TABLE_X) * SPEND_TABLE_X
+            ys.setflags(write=False)
+            Sigmoid._spend_cache[key] = ys
+        return ys
+
+    def batch_spend_inverse(self, y_arr):
+        # Newton like bisect_spend_inverse over a whole array of y at once,
+        # starting from linear interpolation in the spend table.
+        # Returns x and the mask of points where p(x)*x really is y, the rest are out of reach
+        x = np.interp(y_arr, self.spend_table(), SPEND_TABLE_X)
+        for i in range(2):
+            p = self.get_probability_vec(x)
+            x -= (p * x - y_arr) / (p + x * self.scale * p * (1.0 - p))
+            np.clip(x, 0.0, 100.0, out=x)
+        converged = np.fabs(self.get_probability_vec(x) * x - y_arr) <= 0.000001
+        bad = ~converged
+        if bad.any():
+            x[bad], converged[bad] = self._batch_bisection_spend_inverse(y_arr[bad])
+        return x, converged
+
+    def _batch_bisection_spend_inverse(self, y_arr):
+        # _bisection_spend_inverse over an array, points stop moving once they are within tolerance
+        min_x = np.zeros_like(y_arr)
+        max_x = np.full_like(y_arr, 100.0)
+        x = np.zeros_like(y_arr)
+        active = np.ones(y_arr.shape, dtype=bool)
+        for steps in range(51):
+            x = np.where(active, (min_x + max_x) / 2.0, x)
+            a = self.get_probability_vec(x) * x
+            above = a > y_arr
+            max_x = np.where(active & above, x, max_x)
+            min_x = np.where(active & ~above, x, min_x)
+            active &= np.fabs(a - y_arr) > 0.000001
+            if not active.any():
+                break
+        return x, ~active
+
+    def _bisection_spend_inverse(self, y):
         min_x = 0.0
         max_x = 100.0
         a = -100
@@ -44,7 +137,8 @@ class Sigmoid:
                 min_x = x
                 
             if steps > 50:
-                raise ("Didn't find the inverse of %f" % y) 
+                # y is out of reach on [0, 100], there is no bid that spends it
+                return None
         return x
         
 
@@ -57,62 +151,41 @@ class Sigmoid:
             y = 1.0 -EPSILON/10
         return (math.log(y) - math.log(1 - y)) / self.scale + self.offset
 
-    def numeric_derivative(self, x):
-        E = 0.00001
-        a1 = self.get_probability(x-E)
-        a2 = self.get_probability(x+E)
-        return (a2-a1) / (2 * E)
-
-    def numeric_derivative_mul_x(self, x):
-        E = 0.00001
-        x1 = x-E
-        x2 = x+E
-        a1 = self.get_probability(x1)*x1
-        a2 = self.get_probability(x2)*x2
-        return (a2-a1) / (2 * E)
-    
     def marginal_utility_of_spend_numeric(self, x):
         if x > 0.0001:
-            # numeric formula
-            #return self.value * self.numeric_derivative(x) / self.numeric_derivative_mul_x(x)
-            # formula from the article
-            Wx = self.get_probability(x)
-            Wdx = self.numeric_derivative(x)
-            return self.value * Wdx / (Wdx * x + Wx)
+            # the formula from the article, value * W'(x) / (W'(x) * x + W(x)), simplifies to M(x)
+            return self.M(x)
         else:
             return 0.0
 
     # M() as per gemini, analytical formula...
+    # 1 - s(x) is taken directly as 1/(1+exp(z)), so it does not cancel to 0 next to s(x) = 1
+    def one_minus_probability(self, x):
+        z = (x-self.offset)*self.scale
+        if z > 0.0:
+            # same value as exp(-z)/(1+exp(-z)), but exp(z) would overflow past z ~ 709
+            e = math.exp(-z)
+            return e/(1.0+e)
+        return 1.0/(1.0+math.exp(z))
+
     def M(self, x):
-        s_val = self.get_probability(x) 
-        if abs(1.0 - s_val) < 1e-15:
-            return 0.0
-        
-        numerator = self.value * self.scale * (1.0 - s_val)
-        denominator = self.scale * x * (1.0 - s_val) + 1.0
-        
-        if abs(denominator) < 1e-15:
-            # This case is unlikely under normal parameters but is good practice
-            return float('inf') if numerator > 0 else float('-inf')
-            
-        return numerator / denominator
+        one_minus_s = self.one_minus_probability(x)
+        return self.value * self.scale * one_minus_s / (self.scale * x * one_minus_s + 1.0)
 
     def marginal_utility_of_spend(self, x):
         return self.M(x)
 
     def M_prime(self, x):
         """The derivative of M(x)."""
-        s_val = self.get_probability(x) 
-        if abs(1.0 - s_val) < 1e-15:
-            return 0.0
+        one_minus_s = self.one_minus_probability(x)
+        return -self.value * (self.scale**2) * one_minus_s / (self.scale * x * one_minus_s + 1.0)**2
 
-        numerator = -self.value * (self.scale**2) * (1.0 - s_val)
-        denominator = (self.scale * x * (1.0 - s_val) + 1.0)**2
-        
-        if abs(denominator) < 1e-15:
-             return float('-inf') # Derivative approaches -inf
-             
-        return numerator / denominator
+    def M_and_M_prime(self, x):
+        """M(x) and M_prime(x) from one sigmoid evaluation."""
+        one_minus_s = self.one_minus_probability(x)
+        denominator = self.scale * x * one_minus_s + 1.0
+        return (self.value * self.scale * one_minus_s / denominator,
+                -self.value * (self.scale**2) * one_minus_s / denominator**2)
 
     def marginal_utility_of_spend_inverse(self, y_target):
         # --- Newton-Raphson Iteration ---
@@ -123,8 +196,7 @@ class Sigmoid:
 
         for i in range(max_iterations):
             # Calculate the value of M(x) and its derivative at the current x
-            m_val = self.M(x)
-            m_prime_val = self.M_prime(x)
+            m_val, m_prime_val = self.M_and_M_prime(x)
 
             # The function whose root we are finding is f(x) = M(x) - y_target
             f_x = m_val - y_target
@@ -153,6 +225,40 @@ class Sigmoid:
 #        print(f"Warning: Failed to converge within {max_iterations} iterations.")
         return x
 
+    def batch_marginal_utility_of_spend_inverse(self, y_target):
+        """marginal_utility_of_spend_inverse over an array, 0 where the scalar version gives None.
+
+        self.value may also be an array broadcasting with y_target."""
+        max_iterations = 100
+        tolerance = 1e-6
+        x = np.full(np.shape(y_target), 10.0)
+        result = np.zeros_like(x)
+        active = np.ones(x.shape, dtype=bool)
+        for i in range(max_iterations):
+            # M(x) and M_prime(x), x stays positive so the denominator is at least 1
+            one_minus_s = 1.0/(1.0+np.exp((x-self.offset)*self.scale))
+            denominator = self.scale * x * one_minus_s + 1.0
+            m_val = self.value * self.scale * one_minus_s / denominator
+            m_prime_val = -self.value * (self.scale**2) * one_minus_s / denominator**2
+
+            flat = active & (np.fabs(m_prime_val) < 1e-15)
+            for x_flat in x[flat]:
+                print(f"Warning: Derivative is close to zero at x={x_flat}. Method cannot proceed.")
+            active &= ~flat
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_new = x - (m_val - y_target) / m_prime_val
+            x_new = np.where(x_new <= 0, x / 2.0, x_new)
+
+            converged = active & (np.fabs(x_new - x) < tolerance)
+            result[converged] = x_new[converged]
+            active &= ~converged
+            x = np.where(active, x_new, x)
+            if not active.any():
+                return result
+        result[active] = x[active]
+        return result
+
 
 
 
@@ -163,6 +269,9 @@ class Sigmoid:
 
 
 class Parameters:
+    __slots__ = ('total_budget', 'total_volume', 'sigmoid_A_value', 'sigmoid_A_scale', 'sigmoid_A_offset',
+                 'sigmoid_B_value', 'sigmoid_B_scale', 'sigmoid_B_offset', 'percent_A')
+
     def __init__(self):
         self.total_budget = 2
         self.total_volume = 1
@@ -186,6 +295,10 @@ class Parameters:
         self.sigmoid_B_scale=1.0
         self.sigmoid_B_offset=7.0
 
+    def key(self):
+        # Rounded below what the sliders show, so jitter while dragging maps to the same key
+        return tuple(round(getattr(self, k), 3) for k in sorted(Parameters.__slots__))
+
     def total_volume_A(self):
         return self.percent_A * self.total_volume	# total volume = 2 impressions
     
@@ -194,73 +307,101 @@ class Parameters:
         
 
 
-def setup_optimization_data(p: Parameters):
-    """Setup sigmoid objects and compute optimization data."""
-    s_A = Sigmoid(p.sigmoid_A_scale, p.sigmoid_A_offset, p.sigmoid_A_value)
-    s_B = Sigmoid(p.sigmoid_B_scale, p.sigmoid_B_offset, p.sigmoid_B_value) 
-
-    # Initialize data lists
-    l_cpm_A = []
-    l_cpm_B = []
-    l_imp_bought_A = []
-    l_imp_bought_B = []
-    l_total_value = []
-    l_prob_A = []
-    l_prob_B = []
-    l_prob_range = []
-    l_budget_range = []  # For x-axis of value vs budget curve
-    l_max_value = []     # For y-axis of value vs budget curve
-    l_value_per_cost = [] # For efficiency curve
-    l_marginal_utility_A_budget = []  # Marginal utility A for each budget
-    l_marginal_utility_B_budget = []  # Marginal utility B for each budget
+def _sweep(budget, volume_A, volume_B, s_A, s_B):
+    """For every cpm A in CPM_GRID spend the rest of the budget on B, returns arrays over the grid and the mask of valid points."""
+    cpm = CPM_GRID
+    imp_bought_A = s_A.get_probability_range() * volume_A
+    imp_spend_A = imp_bought_A * cpm
+    imp_spend_B = budget - imp_spend_A
+    # spend on A only grows with cpm A, so the points within budget are a prefix of the grid
+    n = int(np.searchsorted(imp_spend_A, budget, side='right'))
+    if volume_B <= 0.0:
+        # nothing to buy on B, so the rest of the budget can never be spent
+        n = 0
+    spent = np.zeros(cpm.size, dtype=bool)
+    cpm_B = np.zeros_like(cpm)
+    cpm_B[:n], spent[:n] = s_B.batch_spend_inverse(imp_spend_B[:n] / volume_B)
+    imp_bought_B = np.zeros_like(cpm)
+    imp_bought_B[:n] = s_B.get_probability_vec(cpm_B[:n]) * volume_B
+    total_value = imp_bought_A * s_A.value + imp_bought_B * s_B.value
+    # points within budget where some B bid spends exactly the rest of it
+    valid = spent & (cpm_B >= 0.0)
+    return imp_bought_A, imp_bought_B, cpm_B, total_value, valid
+
+
+def _best_for_budgets(budgets, volume_A, volume_B, s_A, s_B):
+    """_sweep and _best_index for a whole array of budgets at once.
+
+    Returns max value, cpm A and cpm B for each budget, zeros where no point is valid."""
+    imp_bought_A = s_A.get_probability_range() * volume_A
+    imp_spend_A = imp_bought_A * CPM_GRID
+    budget = budgets[:, None]
+    imp_spend_B = budget - imp_spend_A
+    feasible = imp_spend_B >= 0.0
+    if volume_B <= 0.0:
+        feasible[:] = False
+    # all B inverses of all budgets in one batch
+    spent = np.zeros(imp_spend_B.shape, dtype=bool)
+    cpm_B = np.zeros(imp_spend_B.shape)
+    cpm_B[feasible], spent[feasible] = s_B.batch_spend_inverse(imp_spend_B[feasible] / volume_B)
+    imp_bought_B = s_B.get_probability_vec(cpm_B) * volume_B
+    total_value = imp_bought_A * s_A.value + imp_bought_B * s_B.value
+    valid = spent & (cpm_B >= 0.0)
+
+    masked = np.where(valid, total_value, -np.inf)
+    rows = np.arange(budgets.size)
+    best = np.argmax(masked, axis=1)
+    found = masked[rows, best] > 0.0
+    return (np.where(found, masked[rows, best], 0.0),
+            np.where(found, CPM_GRID[best], 0.0),
+            np.where(found, cpm_B[rows, best], 0.0))
+
+
+def _best_index(total_value, valid):
+    """Index of the first maximum total value among valid points, None when no valid point has any value."""
+    masked = np.where(valid, total_value, -np.inf)
+    best = int(np.argmax(masked))
+    return best if masked[best] > 0.0 else None
+
+
+def reuse_sigmoid(s, scale, offset, value):
+    """Return s if it already has these parameters, otherwise a new Sigmoid."""
+    if s is not None and s.scale == scale and s.offset == offset and s.value == value:
+        return s
+    return Sigmoid(scale, offset, value)
+
+
+def setup_optimization_data(p: Parameters, s_A=None, s_B=None):
+    """Setup sigmoid objects (reusing s_A and s_B when they still match p) and compute optimization data."""
+    s_A = reuse_sigmoid(s_A, p.sigmoid_A_scale, p.sigmoid_A_offset, p.sigmoid_A_value)
+    s_B = reuse_sigmoid(s_B, p.sigmoid_B_scale, p.sigmoid_B_offset, p.sigmoid_B_value)
 
     # Generate probability data for the range
-    for cpm_input in range(0, int(MAX_CPM / STEP)):
-        cpm = 1.0 * cpm_input * STEP
-        l_prob_range.append(cpm)
-        l_prob_A.append(s_A.get_probability(cpm))
-        l_prob_B.append(s_B.get_probability(cpm))
+    cpm = CPM_GRID
+    l_prob_range = cpm
+    l_prob_A = s_A.get_probability_range()
+    l_prob_B = s_B.get_probability_range()
 
     l2 = []
     l22 = []
 
-    # Main optimization loop - find optimal CPM values
+    # Main optimization sweep - find optimal CPM values
+    imp_bought_A, imp_bought_B, cpm_B, total_value, valid = _sweep(p.total_budget, p.total_volume_A(), p.total_volume_B(), s_A, s_B)
+
+    l_cpm_A = cpm[valid]
+    l_cpm_B = cpm_B[valid]
+    l_imp_bought_A = imp_bought_A[valid]
+    l_imp_bought_B = imp_bought_B[valid]
+    l_total_value = total_value[valid]
+
     max_value = 0.0
     min_cost_cpm_A = 0
     min_cost_cpm_B = 0
-    for cpm_input in range(0, int(MAX_CPM / STEP)):
-        cpm_A = 1.0 * cpm_input * STEP
-        imp_bought_A = s_A.get_probability(cpm_A) * p.total_volume_A()
-        imp_value_A = imp_bought_A * s_A.value
-        imp_spend_A = imp_bought_A * cpm_A
-        
-        if p.total_budget - imp_spend_A < 0.0: # impossible 
-            continue
-        imp_spend_B = p.total_budget - imp_spend_A
-        
-        if imp_spend_B < 0:
-            continue
-        cpm_B = s_B.bisect_spend_inverse(imp_spend_B / p.total_volume_B())
-        if cpm_B <= 0.0:
-            continue
-        imp_bought_B = s_B.get_probability(cpm_B) * p.total_volume_B()
-        imp_value_B = imp_bought_B * s_B.value
-        
-        total_spend = imp_spend_A + imp_spend_B
-      
-        if math.fabs(total_spend - p.total_budget) > EPSILON:	# make sure we've bought enough impressions
-            continue
-       
-        total_value = imp_value_A + imp_value_B
-        if total_value > max_value:
-            max_value = total_value
-            min_cost_cpm_A = cpm_A
-            min_cost_cpm_B = cpm_B
-        l_cpm_A.append(cpm_A) 
-        l_total_value.append(total_value)
-        l_cpm_B.append(cpm_B)
-        l_imp_bought_A.append(imp_bought_A) 
-        l_imp_bought_B.append(imp_bought_B)
+    best = _best_index(total_value, valid)
+    if best is not None:
+        max_value = float(total_value[best])
+        min_cost_cpm_A = float(cpm[best])
+        min_cost_cpm_B = float(cpm_B[best])
     
     # Calculate marginal utility values at optimal points
     marginal_utility_of_spend_A = s_A.marginal_utility_of_spend(min_cost_cpm_A)
@@ -278,11 +419,6 @@ def setup_optimization_data(p: Parameters):
         'l_prob_A': l_prob_A,
         'l_prob_B': l_prob_B,
         'l_prob_range': l_prob_range,
-        'l_budget_range': l_budget_range,
-        'l_max_value': l_max_value,
-        'l_value_per_cost': l_value_per_cost,
-        'l_marginal_utility_A_budget': l_marginal_utility_A_budget,
-        'l_marginal_utility_B_budget': l_marginal_utility_B_budget,
         'l2': l2,
         'l22': l22,
         'max_value': max_value,
@@ -296,73 +432,104 @@ def setup_optimization_data(p: Parameters):
 def update_axis5_text_display(chart, data):
     """Update axis 5 with text display of marginal utility values."""
     a = chart.axis5
-    a.axis('off')  # Hide axes for text display
-    a.text(0.5, 0.8, f'Marginal Effectiveness of Spend A: {data["marginal_utility_of_spend_A"]:.3f}', 
-           transform=a.transAxes, fontsize=14, ha='center', va='center',
-           bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8))
-    a.text(0.5, 0.6, f'Marginal Effectiveness of Spend B: {data["marginal_utility_of_spend_B"]:.3f}', 
-           transform=a.transAxes, fontsize=14, ha='center', va='center',
-           bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.8))
-    a.text(0.5, 0.3, f'Optimal CPM A: {data["min_cost_cpm_A"]:.2f}  |  Optimal CPM B: {data["min_cost_cpm_B"]:.2f}', 
-           transform=a.transAxes, fontsize=12, ha='center', va='center',
-           bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))
+    texts = chart.artists.get('axis5')
+    if texts is None:
+        a.axis('off')  # Hide axes for text display
+        texts = [a.text(0.5, 0.8, '', transform=a.transAxes, fontsize=14, ha='center', va='center',
+                        bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.8)),
+                 a.text(0.5, 0.6, '', transform=a.transAxes, fontsize=14, ha='center', va='center',
+                        bbox=dict(boxstyle='round', facecolor='lightgreen', alpha=0.8)),
+                 a.text(0.5, 0.3, '', transform=a.transAxes, fontsize=12, ha='center', va='center',
+                        bbox=dict(boxstyle='round', facecolor='lightyellow', alpha=0.8))]
+        chart.artists['axis5'] = texts
+    texts[0].set_text(f'Marginal Effectiveness of Spend A: {data["marginal_utility_of_spend_A"]:.3f}')
+    texts[1].set_text(f'Marginal Effectiveness of Spend B: {data["marginal_utility_of_spend_B"]:.3f}')
+    texts[2].set_text(f'Optimal CPM A: {data["min_cost_cpm_A"]:.2f}  |  Optimal CPM B: {data["min_cost_cpm_B"]:.2f}')
 
 
 def update_axis1_win_probability(chart, data):
     """Update axis 1 with win probability curves."""
     a = chart.axis1
-    a.set_xlim(right = MAX_CPM)
-    line1 = a.plot(data['l_prob_range'], data['l_prob_A'], 'C0-', label='Win probability A')
-    line2 = a.plot(data['l_prob_range'], data['l_prob_B'], 'C1-', label='Win probability B')
-    
-    # Add both vertical lines and points using same colors
-    a.vlines(data['min_cost_cpm_A'], 0, data['s_A'].get_probability(data['min_cost_cpm_A']), 'C0', linestyles='--', alpha=0.5)
-    a.vlines(data['min_cost_cpm_B'], 0, data['s_B'].get_probability(data['min_cost_cpm_B']), 'C1', linestyles='--', alpha=0.5)
-    a.plot(data['min_cost_cpm_A'], data['s_A'].get_probability(data['min_cost_cpm_A']), 'C0o', label='Optimal bid A')
-    a.plot(data['min_cost_cpm_B'], data['s_B'].get_probability(data['min_cost_cpm_B']), 'C1o', label='Optimal bid B')
-    
-    a.legend(loc='lower right')
+    lines = chart.artists.get('axis1')
+    if lines is None:
+        a.set_xlim(0, MAX_CPM)
+        lines = {
+            'prob_A': a.plot([], [], 'C0-', label='Win probability A')[0],
+            'prob_B': a.plot([], [], 'C1-', label='Win probability B')[0],
+            # Vertical lines and points using same colors
+            'vline_A': a.plot([], [], 'C0--', alpha=0.5)[0],
+            'vline_B': a.plot([], [], 'C1--', alpha=0.5)[0],
+            'bid_A': a.plot([], [], 'C0o', label='Optimal bid A')[0],
+            'bid_B': a.plot([], [], 'C1o', label='Optimal bid B')[0],
+        }
+        a.legend(loc='lower right')
+        chart.artists['axis1'] = lines
+
+    cpm_A = data['min_cost_cpm_A']
+    cpm_B = data['min_cost_cpm_B']
+    prob_A = data['s_A'].get_probability(cpm_A)
+    prob_B = data['s_B'].get_probability(cpm_B)
+    lines['prob_A'].set_data(data['l_prob_range'], data['l_prob_A'])
+    lines['prob_B'].set_data(data['l_prob_range'], data['l_prob_B'])
+    lines['vline_A'].set_data([cpm_A, cpm_A], [0, prob_A])
+    lines['vline_B'].set_data([cpm_B, cpm_B], [0, prob_B])
+    lines['bid_A'].set_data([cpm_A], [prob_A])
+    lines['bid_B'].set_data([cpm_B], [prob_B])
+    a.relim()
+    a.autoscale_view()
 
 
 def update_axis3_cpm_and_value(chart, data):
     """Update axis 3 with CPM B vs CPM A and total value."""
     a = chart.axis3
-    
-    a.set_ylim(top = max(data['l_cpm_B']))
-    a.set_xlim(right = MAX_CPM)
-    a.set_xlabel('Cpm A', color='C0')
-    a.tick_params(axis='x', labelcolor='C0')
-    
-    # Plot Cpm B on left y-axis
-    a.set_ylabel('Cpm B', color='orange')
-    a.tick_params(axis='y', labelcolor='orange')
-    line1 = a.plot(data['l_cpm_A'], data['l_cpm_B'], label='Cpm B', color='C1')
-    
-    # Create right y-axis for Total value
-    ax3_right = a.twinx()
-    ax3_right.set_ylim(bottom = 0.0)
-    ax3_right.set_ylim(top = data['max_value'])
-    line2 = ax3_right.plot(data['l_cpm_A'], data['l_total_value'], 'g-', label='Total value')
-    ax3_right.set_ylabel('Total value', color='g')
-    ax3_right.tick_params(axis='y', labelcolor='g')
-    
-    # Add green dot at intersection of green curve with vertical line
-    line5 = ax3_right.plot(data['min_cost_cpm_A'], data['max_value'], 'go', label='Maximum value')
-    
-    a.vlines(data['min_cost_cpm_A'], 0, data['min_cost_cpm_B'], 'C0', linestyles='--', alpha=0.5)
-    line3 = a.plot(data['min_cost_cpm_A'], 0, 'C0o', label='Optimal bid A')
-    
-    # Add horizontal orange line where vertical intersects orange curve, with dot
-    a.hlines(data['min_cost_cpm_B'], 0, data['min_cost_cpm_A'], 'C1', linestyles='--', alpha=0.5)
-    line4 = a.plot(0, data['min_cost_cpm_B'], 'C1o', label='Optimal bid B')
-    
-    # Combine legends from all plot elements
-    lines = line1 + line2 + line3 + line4 + line5
-    labels = [l.get_label() for l in lines]
-    a.legend(lines, labels, loc='upper right')
-    
-    # Adjust layout for axis3 to ensure x-axis label is visible
-    chart.axis3.figure.subplots_adjust(bottom=0.15)
+    lines = chart.artists.get('axis3')
+    if lines is None:
+        a.set_xlim(0, MAX_CPM)
+        a.set_xlabel('Cpm A', color='C0')
+        a.tick_params(axis='x', labelcolor='C0')
+
+        # Cpm B on left y-axis
+        a.set_ylabel('Cpm B', color='orange')
+        a.tick_params(axis='y', labelcolor='orange')
+
+        # Create right y-axis for Total value
+        ax3_right = a.twinx()
+        ax3_right.set_ylabel('Total value', color='g')
+        ax3_right.tick_params(axis='y', labelcolor='g')
+
+        chart.axis3_right = ax3_right
+        lines = {
+            'cpm_B': a.plot([], [], label='Cpm B', color='C1')[0],
+            'total_value': ax3_right.plot([], [], 'g-', label='Total value')[0],
+            # Green dot at intersection of green curve with vertical line
+            'max_value': ax3_right.plot([], [], 'go', label='Maximum value')[0],
+            'vline_A': a.plot([], [], 'C0--', alpha=0.5)[0],
+            'bid_A': a.plot([], [], 'C0o', label='Optimal bid A')[0],
+            # Horizontal orange line where vertical intersects orange curve, with dot
+            'hline_B': a.plot([], [], 'C1--', alpha=0.5)[0],
+            'bid_B': a.plot([], [], 'C1o', label='Optimal bid B')[0],
+        }
+
+        # Combine legends from all plot elements
+        legend_lines = [lines[k] for k in ('cpm_B', 'total_value', 'bid_A', 'bid_B', 'max_value')]
+        a.legend(legend_lines, [l.get_label() for l in legend_lines], loc='upper right')
+
+        # Adjust layout for axis3 to ensure x-axis label is visible
+        chart.axis3.figure.subplots_adjust(bottom=0.15)
+        chart.artists['axis3'] = lines
+
+    cpm_A = data['min_cost_cpm_A']
+    cpm_B = data['min_cost_cpm_B']
+    # With no valid split (e.g. zero budget) the series are empty, fall back to the full range
+    a.set_ylim(0, data['l_cpm_B'].max() if len(data['l_cpm_B']) else MAX_CPM)
+    chart.axis3_right.set_ylim(0.0, data['max_value'] if data['max_value'] > 0.0 else 1.0)
+    lines['cpm_B'].set_data(data['l_cpm_A'], data['l_cpm_B'])
+    lines['total_value'].set_data(data['l_cpm_A'], data['l_total_value'])
+    lines['max_value'].set_data([cpm_A], [data['max_value']])
+    lines['vline_A'].set_data([cpm_A, cpm_A], [0, cpm_B])
+    lines['bid_A'].set_data([cpm_A], [0])
+    lines['hline_B'].set_data([0, cpm_A], [cpm_B, cpm_B])
+    lines['bid_B'].set_data([0], [cpm_B])
 
 
 def update_axis2_marginal_utility(chart, p: Parameters, data):
@@ -371,97 +538,82 @@ def update_axis2_marginal_utility(chart, p: Parameters, data):
     s_A = data['s_A']
     s_B = data['s_B']
     
-    # Set up axes for marginal effectiveness of spend vs budget
+    # Range of marginal effectiveness of spend on the x axis
     marginal_utility_start = s_A.marginal_utility_of_spend(4)
     marginal_utility_end = s_A.marginal_utility_of_spend(20)
-    a.set_xlim(left=marginal_utility_start, right=marginal_utility_end)  # Decreasing toward the right (20 to 0.01)
-    a.set_xlabel('Marginal Effectivness of Spend')
-    a.grid(True, alpha=0.3)  # Add grid for better readability
     
-    # Create right y-axis for the inverse functions
-    ax2_right = a.twinx()
-    
-    # Generate marginal utility values for x-axis
-    marginal_utility_range = []
-    inverse_values_A = []
-    inverse_values_B = []
-    budget_used_values = []
-    
-    # Create range from marginal_utility_end to marginal_utility_start (decreasing)
+    # Generate marginal utility values for x-axis, linear from marginal_utility_end to marginal_utility_start (decreasing)
     num_points = 50
-    for i in range(num_points):
-        # Linear interpolation from end to start
-        mu_value = marginal_utility_end + (marginal_utility_start - marginal_utility_end) * i / (num_points - 1)
-        marginal_utility_range.append(mu_value)
-        
-        # Call inverse functions for both s_A and s_B
-        try:
-            cpm_A = s_A.marginal_utility_of_spend_inverse(mu_value)
-            cpm_B = s_B.marginal_utility_of_spend_inverse(mu_value)
-            # Calculate budget used for both curves
-            cpm_A = cpm_A if cpm_A is not None else 0
-            cpm_B = cpm_B if cpm_B is not None else 0
-            inverse_values_A.append(cpm_A)
-            inverse_values_B.append(cpm_B)
-            
-            
-            # Budget = volume * probability * CPM
-            budget_A = p.total_volume_A() * s_A.get_probability(cpm_A) * cpm_A
-            budget_B = p.total_volume_B() * s_B.get_probability(cpm_B) * cpm_B
-            total_budget = budget_A + budget_B
-            
-            budget_used_values.append(total_budget)
-        except:
-            inverse_values_A.append(0)
-            inverse_values_B.append(0)
-            budget_used_values.append(0)
+    marginal_utility_range = marginal_utility_end + (marginal_utility_start - marginal_utility_end) * np.arange(num_points) / (num_points - 1)
     
-    # Plot budget used curve on left y-axis
-    line_budget = a.plot(marginal_utility_range, budget_used_values, 'g-', label='Budget', linewidth=2)
-    a.set_ylabel('Budget', color='g')
-    a.tick_params(axis='y', labelcolor='g')
+    # Call inverse functions for both s_A and s_B
+    inverse_values_A = s_A.batch_marginal_utility_of_spend_inverse(marginal_utility_range)
+    inverse_values_B = s_B.batch_marginal_utility_of_spend_inverse(marginal_utility_range)
     
-    # Plot inverse functions on right y-axis
-    line1 = ax2_right.plot(marginal_utility_range, inverse_values_A, 'C0-', label='Bid A', linewidth=2)
-    line2 = ax2_right.plot(marginal_utility_range, inverse_values_B, 'C1-', label='Bid B', linewidth=2)
+    # Budget used for both curves, budget = volume * probability * CPM
+    budget_A = p.total_volume_A() * s_A.get_probability_vec(inverse_values_A) * inverse_values_A
+    budget_B = p.total_volume_B() * s_B.get_probability_vec(inverse_values_B) * inverse_values_B
+    budget_used_values = budget_A + budget_B
     
-    # Add vertical line at marginal_utility_of_spend_A
-    a.axvline(x=data['marginal_utility_of_spend_A'], color='g', alpha=0.7, label='Optimal Marginal effectiveness of spend')
+    lines = chart.artists.get('axis2')
+    if lines is None:
+        a.set_xlabel('Marginal Effectivness of Spend')
+        a.grid(True, alpha=0.3)  # Add grid for better readability
+        a.set_ylabel('Budget', color='g')
+        a.tick_params(axis='y', labelcolor='g')
+
+        # Create right y-axis for the inverse functions
+        ax2_right = a.twinx()
+        ax2_right.set_ylabel('CPM', color='purple')
+        ax2_right.tick_params(axis='y', labelcolor='purple')
+
+        chart.axis2_right = ax2_right
+        lines = {
+            # Budget used curve on left y-axis, inverse functions on right y-axis
+            'budget': a.plot([], [], 'g-', label='Budget', linewidth=2)[0],
+            'bid_A': ax2_right.plot([], [], 'C0-', label='Bid A', linewidth=2)[0],
+            'bid_B': ax2_right.plot([], [], 'C1-', label='Bid B', linewidth=2)[0],
+            # Vertical line at marginal_utility_of_spend_A
+            'vline': a.axvline(x=0, color='g', alpha=0.7, label='Optimal Marginal effectiveness of spend'),
+            # Horizontal line to the left and intersection dot for budget used curve
+            'hline_budget': a.plot([], [], 'g--', alpha=0.5)[0],
+            'dot_budget': a.plot([], [], 'go', markersize=8, label='')[0],
+            'hline_A': ax2_right.plot([], [], 'C0--', alpha=0.5)[0],
+            'hline_B': ax2_right.plot([], [], 'C1--', alpha=0.5)[0],
+            'dot_A': ax2_right.plot([], [], 'C0o', markersize=8, label='Intersection A dot')[0],
+            'dot_B': ax2_right.plot([], [], 'C1o', markersize=8, label='Intersection B dot')[0],
+        }
+
+        # Combine legends from both axes
+        legend_lines = [lines[k] for k in ('budget', 'bid_A', 'bid_B', 'vline')]
+        ax2_right.legend(legend_lines, [l.get_label() for l in legend_lines], loc='upper right')
+        chart.artists['axis2'] = lines
+
+    lines['budget'].set_data(marginal_utility_range, budget_used_values)
+    lines['bid_A'].set_data(marginal_utility_range, inverse_values_A)
+    lines['bid_B'].set_data(marginal_utility_range, inverse_values_B)
 
     # Find intersection point for budget used curve
     # Budget = volume * probability * CPM
+    mu_A = data['marginal_utility_of_spend_A']
     budget_A = p.total_volume_A() * s_A.get_probability(data['min_cost_cpm_A']) * data['min_cost_cpm_A']
     budget_B = p.total_volume_B() * s_B.get_probability(data['min_cost_cpm_B']) * data['min_cost_cpm_B']
     total_budget = budget_A + budget_B
 
-    # Add horizontal line to the left for budget used curve
-    a.hlines(total_budget, marginal_utility_start, data['marginal_utility_of_spend_A'], 'g', linestyles='--', alpha=0.5)
-    
-    # Add intersection dot for budget used curve
-    a.plot(data['marginal_utility_of_spend_A'], total_budget, 'go', markersize=8, label='')
-
-    ax2_right.hlines(data['min_cost_cpm_B'], 0, data['marginal_utility_of_spend_A'], 'C1', linestyles='--', alpha=0.5)
-    ax2_right.hlines(data['min_cost_cpm_A'], 0, data['marginal_utility_of_spend_A'], 'C0', linestyles='--', alpha=0.5)
+    lines['vline'].set_xdata([mu_A, mu_A])
+    lines['hline_budget'].set_data([marginal_utility_start, mu_A], [total_budget, total_budget])
+    lines['dot_budget'].set_data([mu_A], [total_budget])
+    lines['hline_B'].set_data([0, mu_A], [data['min_cost_cpm_B'], data['min_cost_cpm_B']])
+    lines['hline_A'].set_data([0, mu_A], [data['min_cost_cpm_A'], data['min_cost_cpm_A']])
 
     # Mark intersection points with dots
-    ax2_right.plot(data['marginal_utility_of_spend_A'], data['min_cost_cpm_A'], 'C0o', markersize=8, label='Intersection A dot')
-    ax2_right.plot(data['marginal_utility_of_spend_A'], data['min_cost_cpm_B'], 'C1o', markersize=8, label='Intersection B dot')
-    
-    # Set right y-axis properties
-    ax2_right.set_ylabel('CPM', color='purple')
-    ax2_right.tick_params(axis='y', labelcolor='purple')
-    
-    # Combine legends from both axes
-    lines = line_budget + line1 + line2  # Include budget curve from left axis
-    labels = [l.get_label() for l in lines]
-    
-    # Add the vertical line to the legend
-    lines_main = a.get_lines()  # Get lines from main axis
-    if len(lines_main) > 1:  # Check if we have more than just the budget line
-        lines.extend(lines_main[-1:])  # Add the last line (vertical line)
-        labels.extend([lines_main[-1].get_label()])
-    
-    ax2_right.legend(lines, labels, loc='upper right')
+    lines['dot_A'].set_data([mu_A], [data['min_cost_cpm_A']])
+    lines['dot_B'].set_data([mu_A], [data['min_cost_cpm_B']])
+
+    for ax in (a, chart.axis2_right):
+        ax.relim()
+        ax.autoscale_view(scalex=False)
+    a.set_xlim(left=marginal_utility_start, right=marginal_utility_end)  # Decreasing toward the right (20 to 0.01)
 
 
 def update_axis4_bottom_right_chart(chart, p: Parameters, data, show_value_vs_budget, show_marginal_utility_heatmap):
@@ -482,19 +634,11 @@ def update_axis4_bottom_right_chart(chart, p: Parameters, data, show_value_vs_bu
         # Create meshgrid
         Value, Y_target = np.meshgrid(value_range, y_target_range)
         
-        # Initialize result matrix
-        Z = np.zeros_like(Value)
-        
-        # Calculate marginal_utility_of_spend_inverse for each combination
-        for i in range(len(value_range)):
-            for j in range(len(y_target_range)):
-                # Create temporary sigmoid with varied value
-                temp_sigmoid = Sigmoid(p.sigmoid_A_scale, p.sigmoid_A_offset, value_range[i])
-                try:
-                    result = temp_sigmoid.marginal_utility_of_spend_inverse(y_target_range[j])
-                    Z[j, i] = result if result is not None else 0
-                except:
-                    Z[j, i] = 0
+        # Calculate marginal_utility_of_spend_inverse for each combination at once,
+        # with a sigmoid whose value is the whole Value grid
+        temp_sigmoid = Sigmoid(p.sigmoid_A_scale, p.sigmoid_A_offset, Value)
+        Z = temp_sigmoid.batch_marginal_utility_of_spend_inverse(Y_target)
+        Z = np.where(np.isfinite(Z) & (Z > 0), Z, 0.0)
         
         # Create 3D contour lines along z-axis
         contour_lines = a.contour(Value, Y_target, Z, levels=15, cmap='viridis', alpha=0.8)
@@ -520,57 +664,16 @@ def update_axis4_bottom_right_chart(chart, p: Parameters, data, show_value_vs_bu
         
     elif show_value_vs_budget: 
         # Calculate value vs budget curve
-        l_budget_range = data['l_budget_range']
-        l_max_value = data['l_max_value']
-        l_value_per_cost = data['l_value_per_cost']
-        l_marginal_utility_A_budget = data['l_marginal_utility_A_budget']
-        l_marginal_utility_B_budget = data['l_marginal_utility_B_budget']
-        
-        for budget_x in range(0, int(20.0/BUDGET_STEP)):
-            budget = budget_x * BUDGET_STEP
-            l_budget_range.append(budget)
-            
-            # Find maximum value achievable with this budget
-            max_value_for_budget = 0.0
-            optimal_cpm_A_for_budget = 0.0
-            optimal_cpm_B_for_budget = 0.0
-            
-            for cpm_input in range(0, int(MAX_CPM / STEP)):
-                cmp_A = 1.0 * cpm_input * STEP
-                imp_bought_A = s_A.get_probability(cmp_A) * p.total_volume_A() 
-                imp_value_A = imp_bought_A * s_A.value
-                imp_spend_A = imp_bought_A * cmp_A
-                
-                if budget - imp_spend_A < 0.0:  # Over budget
-                    continue
-                    
-                imp_spend_B = budget - imp_spend_A
-                if imp_spend_B < 0:
-                    continue
-                    
-                cpm_B = s_B.bisect_spend_inverse(imp_spend_B / p.total_volume_B())
-                if cpm_B <= 0.0:
-                    continue
-                    
-                imp_bought_B = s_B.get_probability(cpm_B) * p.total_volume_B()
-                imp_value_B = imp_bought_B * s_B.value
-                
-                total_value = imp_value_A + imp_value_B
-                if total_value > max_value_for_budget:
-                    max_value_for_budget = total_value
-                    optimal_cpm_A_for_budget = cmp_A
-                    optimal_cpm_B_for_budget = cpm_B
-            
-            l_max_value.append(max_value_for_budget)            
-                
-            l_marginal_utility_A_budget.append(s_A.marginal_utility_of_spend(optimal_cpm_A_for_budget))
-            l_marginal_utility_B_budget.append(s_B.marginal_utility_of_spend(optimal_cpm_B_for_budget))
-            
-            # Calculate value per cost (efficiency), avoiding division by zero
-            if budget > 0:
-                l_value_per_cost.append(max_value_for_budget/budget)
-            else:
-                l_value_per_cost.append(0)
+        l_budget_range = BUDGET_GRID
+        l_max_value, optimal_cpm_A, optimal_cpm_B = _best_for_budgets(l_budget_range, p.total_volume_A(), p.total_volume_B(), s_A, s_B)
+        
+        # Marginal utility at the optimum of each budget
+        l_marginal_utility_A_budget = [s_A.marginal_utility_of_spend(x) for x in optimal_cpm_A.tolist()]
+        l_marginal_utility_B_budget = [s_B.marginal_utility_of_spend(x) for x in optimal_cpm_B.tolist()]
+        
+        # Calculate value per cost (efficiency), avoiding division by zero, stays 0 for budget 0
+        l_value_per_cost = np.zeros_like(l_budget_range)
+        np.divide(l_max_value, l_budget_range, out=l_value_per_cost, where=l_budget_range > 0)
         
         # Plot value vs budget curve in bottom right with two y-axes
         a.clear()
@@ -620,9 +723,19 @@ def update_axis4_bottom_right_chart(chart, p: Parameters, data, show_value_vs_bu
         a.legend()
 
 
-def update_axis(chart, p: Parameters, save_to_png=False, show_value_vs_budget=False, show_marginal_utility_heatmap=False):
+def axis4_inputs(p: Parameters, show_value_vs_budget, show_marginal_utility_heatmap):
+    """Everything the bottom-right chart depends on, it only needs redrawing when this changes."""
+    if show_marginal_utility_heatmap:
+        # the heatmap sweeps the value itself, only the shape of A matters
+        return ('heatmap', p.sigmoid_A_scale, p.sigmoid_A_offset)
+    elif show_value_vs_budget:
+        return ('value_vs_budget', p.key())
+    return ('empty',)
+
+
+def update_axis(chart, p: Parameters, save_to_png=False, show_value_vs_budget=False, show_marginal_utility_heatmap=False, redraw_axis4=True):
     # Setup optimization data
-    data = setup_optimization_data(p)
+    data = chart.optimization_data(p)
     
     # Update axis 5 (text display)
     update_axis5_text_display(chart, data)
@@ -637,7 +750,8 @@ def update_axis(chart, p: Parameters, save_to_png=False, show_value_vs_budget=Fa
     update_axis2_marginal_utility(chart, p, data)
     
     # Update axis 4 (bottom-right chart)
-    update_axis4_bottom_right_chart(chart, p, data, show_value_vs_budget, show_marginal_utility_heatmap)
+    if redraw_axis4:
+        update_axis4_bottom_right_chart(chart, p, data, show_value_vs_budget, show_marginal_utility_heatmap)
 
     # Save plots to PNG if requested
     if save_to_png:
@@ -661,7 +775,7 @@ def update_axis(chart, p: Parameters, save_to_png=False, show_value_vs_budget=Fa
         print("Plots saved as PNG files")
     
 
-class Chart(FigureCanvas):
+class Chart:
     def __init__(self):
         # Create five separate figures instead of one with subplots
         self.fig1 = Figure(figsize=(6, 4.2), dpi=100)
@@ -691,109 +805,96 @@ class Chart(FigureCanvas):
         self.show_value_vs_budget = False  # Default to off
         self.show_marginal_utility_heatmap = False  # New flag for heatmap
         self.axis4_colorbar = None  # Store colorbar reference for proper removal
+        self.artists = {}  # Persistent artists of each axis, filled on the first update_axis
+        self.s_A = None  # Sigmoids of the last update_axis
+        self.s_B = None
+        self._data_cache = OrderedDict()  # Parameters.key() -> setup_optimization_data result, least recently used first
+        self._laid_out = set()  # Figures that went through tight_layout at least once
         update_axis(self, self.p, show_value_vs_budget=self.show_value_vs_budget, show_marginal_utility_heatmap=self.show_marginal_utility_heatmap)
-        
-        # Use the first figure as the main canvas
-        super().__init__(self.fig1)
-        self.set_size_request(600, 400)
-        plt.ion()
+        self._axis4_key = axis4_inputs(self.p, self.show_value_vs_budget, self.show_marginal_utility_heatmap)
+        self._last_key = self.update_key()
+
+        # One canvas per figure, these are the widgets MainWindow lays out
+        self.canvases = [FigureCanvas(fig) for fig in (self.fig1, self.fig2, self.fig3, self.fig4, self.fig5)]
+
+    def optimization_data(self, p):
+        """setup_optimization_data(p) with an LRU cache of the last DATA_CACHE_SIZE parameter keys."""
+        key = p.key()
+        data = self._data_cache.get(key)
+        if data is None:
+            data = setup_optimization_data(p, self.s_A, self.s_B)
+            self._data_cache[key] = data
+            if len(self._data_cache) > DATA_CACHE_SIZE:
+                self._data_cache.popitem(last=False)
+        else:
+            self._data_cache.move_to_end(key)
+        self.s_A = data['s_A']
+        self.s_B = data['s_B']
+        return data
+
+    def update_key(self):
+        return (self.p.key(), self.show_value_vs_budget, self.show_marginal_utility_heatmap)
 
     def update(self, save_to_png=False):
-        # Clear all axes
-        self.axis1.clear()
-        self.axis2.clear()
-        # Remove any existing twin axes for axis2
-        for ax in self.axis2.figure.axes:
-            if ax != self.axis2 and ax.bbox.bounds == self.axis2.bbox.bounds:
-                self.axis2.figure.delaxes(ax)
-        self.axis3.clear()
-        # Remove any existing twin axes for axis3
-        for ax in self.axis3.figure.axes:
-            if ax != self.axis3 and ax.bbox.bounds == self.axis3.bbox.bounds:
-                self.axis3.figure.delaxes(ax)
-        
-        # Enhanced clearing for axis4 to handle heatmap colorbars properly
-        # Remove existing colorbar first
-        if self.axis4_colorbar is not None:
-            self.axis4_colorbar.remove()
-            self.axis4_colorbar = None
+        # Nothing changed since the last redraw, e.g. a slider signal for the same value
+        key = self.update_key()
+        if key == self._last_key and not save_to_png:
+            return
+        self._last_key = key
+        self._redraw(save_to_png)
+
+    def _redraw(self, save_to_png=False):
+        # Axes 1, 2, 3 and 5 keep their artists (see self.artists) and only get new data,
+        # axis 4 switches between chart types so it is rebuilt, but only when its inputs changed
+        axis4_key = axis4_inputs(self.p, self.show_value_vs_budget, self.show_marginal_utility_heatmap)
+        redraw_axis4 = axis4_key != self._axis4_key
+        self._axis4_key = axis4_key
+        if redraw_axis4:
+            # Enhanced clearing for axis4 to handle heatmap colorbars properly
+            # Remove existing colorbar first
+            if self.axis4_colorbar is not None:
+                self.axis4_colorbar.remove()
+                self.axis4_colorbar = None
             
-        # Clear the axis
-        self.axis4.clear()
-        
-        # Remove any remaining twin axes for axis4
-        axes_to_remove = []
-        for ax in self.axis4.figure.axes:
-            if ax != self.axis4:
-                axes_to_remove.append(ax)
-        for ax in axes_to_remove:
-            self.axis4.figure.delaxes(ax)
-        
-        # Recreate axis4 as 3D if showing marginal utility heatmap, otherwise 2D
-        if self.show_marginal_utility_heatmap:
-            self.fig4.clear()
-            self.axis4 = self.fig4.add_subplot(111, projection='3d')
-        else:
-            # Ensure it's 2D for other modes
-            if hasattr(self.axis4, 'zaxis'):  # Check if it's currently 3D
+            # Clear the axis
+            self.axis4.clear()
+        
+            # Remove any remaining twin axes for axis4
+            axes_to_remove = []
+            for ax in self.axis4.figure.axes:
+                if ax != self.axis4:
+                    axes_to_remove.append(ax)
+            for ax in axes_to_remove:
+                self.axis4.figure.delaxes(ax)
+        
+            # Recreate axis4 as 3D if showing marginal utility heatmap, otherwise 2D
+            if self.show_marginal_utility_heatmap:
                 self.fig4.clear()
-                self.axis4 = self.fig4.add_subplot(111)
+                self.axis4 = self.fig4.add_subplot(111, projection='3d')
+            else:
+                # Ensure it's 2D for other modes
+                if hasattr(self.axis4, 'zaxis'):  # Check if it's currently 3D
+                    self.fig4.clear()
+                    self.axis4 = self.fig4.add_subplot(111)
         
-        # Reset the axis position to ensure proper layout
-        self.axis4.set_position(self.axis4.get_position())
+            # Reset the axis position to ensure proper layout
+            self.axis4.set_position(self.axis4.get_position())
             
-        self.axis5.clear()
-        update_axis(self, self.p, save_to_png, show_value_vs_budget=self.show_value_vs_budget, show_marginal_utility_heatmap=self.show_marginal_utility_heatmap)
-
-        # Adjust layout to ensure labels are visible
-        self.fig1.tight_layout()
-        self.fig2.tight_layout()
-        # Don't use tight_layout for fig3 as we use subplots_adjust instead
-        self.fig4.tight_layout()
-        self.fig5.tight_layout()
-
-        # Redraw all figures
-        self.fig1.canvas.draw()
-        self.fig2.canvas.draw()
-        self.fig3.canvas.draw()
-        self.fig4.canvas.draw()
-        self.fig5.canvas.draw()
-        
-        # Redraw the main canvas
-        self.draw()
-
-
+        update_axis(self, self.p, save_to_png, show_value_vs_budget=self.show_value_vs_budget, show_marginal_utility_heatmap=self.show_marginal_utility_heatmap, redraw_axis4=redraw_axis4)
 
-class ChartContainer(Gtk.Box):
-    def __init__(self):
-        super().__init__(orientation=Gtk.Orientation.VERTICAL)
-        
-        self.p = Parameters()
-        
-        # Create grid layout
-        self.grid = Gtk.Grid()
-        self.grid.set_row_spacing(10)
-        self.grid.set_column_spacing(10)
-        
-        self.append(self.grid)
-        
-        # Initial update
-        self.update()
-        plt.ion()
+        # fig4 is left alone when axis4 was not rebuilt
+        for fig in (self.fig1, self.fig2, self.fig3, self.fig4, self.fig5):
+            if fig is self.fig4 and not redraw_axis4:
+                continue
+            # Adjust layout to ensure labels are visible
+            # Don't use tight_layout for fig3 as we use subplots_adjust instead,
+            # fig1 (fixed 0..MAX_CPM x 0..1 ticks) and fig5 (no axes) only need it once
+            if fig is not self.fig3 and not (fig in (self.fig1, self.fig5) and fig in self._laid_out):
+                fig.tight_layout()
+                self._laid_out.add(fig)
+            fig.canvas.draw_idle()
 
 
-    def update(self):
-        #print("updating to: ", x)
-        for i in range(0,2):
-            for j in range(0, 2):
-                self.axis[i,j].clear()
-        update_axis(self.axis, self.p)
-
-        #self.ax.draw(1)
-        #self.fig.draw()
-        self.draw()
-        #self.ion()
-
 
 class MainWindow(Gtk.ApplicationWindow):
     def __init__(self, *args, **kwargs):
@@ -820,25 +921,17 @@ class MainWindow(Gtk.ApplicationWindow):
         
         # Create charts
         self.chart = Chart()
+        self._pending = {}       # slider values waiting for the next redraw
+        self._timeout_id = None
         
         # Create grid for charts
         self.charts_grid = Gtk.Grid()
         self.charts_grid.set_row_spacing(10)
         self.charts_grid.set_column_spacing(10)
         
-        # Create separate canvases for each chart
-        self.canvas1 = FigureCanvas(self.chart.fig1)
-        self.canvas2 = FigureCanvas(self.chart.fig2)
-        self.canvas3 = FigureCanvas(self.chart.fig3)
-        self.canvas4 = FigureCanvas(self.chart.fig4)
-        self.canvas5 = FigureCanvas(self.chart.fig5)
-        
-        # Set size for each canvas
-        '''self.canvas1.set_size_request(600, 400)
-        self.canvas2.set_size_request(600, 400)
-        self.canvas3.set_size_request(600, 400)
-        self.canvas4.set_size_request(600, 400)
-        '''
+        # Chart already has a canvas for each figure
+        self.canvas1, self.canvas2, self.canvas3, self.canvas4, self.canvas5 = self.chart.canvases
+        
         # Add canvases to grid
         self.charts_grid.attach(self.canvas1, 0, 0, 1, 1)
         self.charts_grid.attach(self.canvas2, 1, 0, 1, 1)
@@ -853,14 +946,8 @@ class MainWindow(Gtk.ApplicationWindow):
         # Store references to controls for updating later
         self.controls = {}
         self.box2.append(self.numeric_entry_box("Auction volume", 1, 20, 'total_volume'))
-        self.box2.append(self.slider_box("Percent of auction A", 0.0, 1.0, 'percent_A'))
-        self.box2.append(self.slider_box("Total budget", 0.0, 20.0, 'total_budget'))
-        self.box2.append(self.slider_box("Sigma A value", 0.001, 5.0, 'sigmoid_A_value'))
-        self.box2.append(self.slider_box("Sigma A scale", 0.001, 2.0, 'sigmoid_A_scale'))
-        self.box2.append(self.slider_box("Sigma A offset", 0.0, 20.0, 'sigmoid_A_offset'))
-        self.box2.append(self.slider_box("Sigma B value", 0.001, 5.0, 'sigmoid_B_value'))
-        self.box2.append(self.slider_box("Sigma B scale", 0.001, 2.0, 'sigmoid_B_scale'))
-        self.box2.append(self.slider_box("Sigma B offset", 0.0, 20.0, 'sigmoid_B_offset'))
+        for label, start_range, end_range, parameter_name in SLIDERS:
+            self.box2.append(self.slider_box(label, start_range, end_range, parameter_name))
         
         # Add Value vs. budget curve toggle
         self.value_budget_toggle = Gtk.CheckButton(label="Value vs. budget curve")
@@ -886,16 +973,15 @@ class MainWindow(Gtk.ApplicationWindow):
         
 
     def slider_box(self, label, start_range, end_range, parameter_name):
-        assert parameter_name in self.chart.p.__dict__.keys()
-        start_value = self.chart.p.__dict__[parameter_name]
+        assert hasattr(self.chart.p, parameter_name)
+        start_value = getattr(self.chart.p, parameter_name)
         slider = Gtk.Scale()
         slider.set_digits(2)  # Number of decimal places to use
         slider.set_range(start_range, end_range)
         slider.set_draw_value(True)  # Show a label with current value
         slider.set_value(start_value)  # Sets the current value/position
-        def change_function(self):
-            self.chart.p.__dict__[parameter_name] = float(slider.get_value())
-            self.chart.update()
+        def change_function(slider):
+            self._schedule(parameter_name, float(slider.get_value()))
         slider.chart = self.chart    
 
         signal_id = slider.connect('value-changed', change_function)
@@ -909,9 +995,23 @@ class MainWindow(Gtk.ApplicationWindow):
         
         return b
 
+    def _schedule(self, parameter_name, value):
+        # Coalesce a burst of drag events into a single redraw
+        self._pending[parameter_name] = value
+        if self._timeout_id is None:
+            self._timeout_id = GLib.timeout_add(SLIDER_DELAY_MS, self._flush)
+
+    def _flush(self):
+        for parameter_name, value in self._pending.items():
+            setattr(self.chart.p, parameter_name, value)
+        self._pending.clear()
+        self._timeout_id = None
+        self.chart.update()
+        return GLib.SOURCE_REMOVE
+
     def numeric_entry_box(self, label, min_value, max_value, parameter_name):
-        assert parameter_name in self.chart.p.__dict__.keys()
-        start_value = self.chart.p.__dict__[parameter_name]
+        assert hasattr(self.chart.p, parameter_name)
+        start_value = getattr(self.chart.p, parameter_name)
         
         # Create a SpinButton for numeric input
         spin_button = Gtk.SpinButton()
@@ -927,9 +1027,9 @@ class MainWindow(Gtk.ApplicationWindow):
             
         spin_button.set_value(start_value)
         
-        def change_function(self):
-            self.chart.p.__dict__[parameter_name] = float(spin_button.get_value())
-            self.chart.update()
+        def change_function(spin_button):
+            # Holding an arrow repeats value-changed, so this goes through the same delay as the sliders
+            self._schedule(parameter_name, float(spin_button.get_value()))
         
         spin_button.chart = self.chart    
         signal_id = spin_button.connect('value-changed', change_function)
@@ -949,16 +1049,17 @@ class MainWindow(Gtk.ApplicationWindow):
 
     def load_interesting_curves(self, button):
         """Load interesting curves and update charts"""
+        self._pending.clear()
         self.chart.p.interesting_curves()
         
         # Update all controls to reflect the new parameter values
         for parameter_name, control_info in self.controls.items():
-            if parameter_name in self.chart.p.__dict__:
+            if hasattr(self.chart.p, parameter_name):
                 widget = control_info['widget']
                 signal_id = control_info['signal_id']
                 # Temporarily block the signal to avoid triggering updates
                 widget.handler_block(signal_id)
-                widget.set_value(self.chart.p.__dict__[parameter_name])
+                widget.set_value(getattr(self.chart.p, parameter_name))
                 widget.handler_unblock(signal_id)
         
         self.chart.update()
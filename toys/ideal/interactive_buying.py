@@ -1,9 +1,10 @@
 import gi,sys
 gi.require_version('Adw', '1')
 gi.require_version('Gtk', '4.0')
-from gi.repository import Gtk, Adw
+from gi.repository import Gtk, Adw, GLib
 
 import math
+import numpy as np
 from matplotlib.backends.backend_gtk4agg import \
     FigureCanvasGTK4Agg as FigureCanvas
 from matplotlib.figure import Figure
@@ -12,15 +13,24 @@ import matplotlib.pyplot as plt
 EPSILON = 0.00001
 MAX_CPM = 20
 STEP = 0.2
+SLIDER_DELAY_MS = 16  # slider changes within this window are drawn once
+CPM_GRID = np.arange(int(MAX_CPM / STEP)) * STEP
+CPM_GRID.flags.writeable = False
 
 
 class Sigmoid:
+    __slots__ = ('scale', 'offset', '_a', '_b')
+    _value_cache = {}  # (scale, offset) -> value over CPM_GRID
+
     def __init__(self, scale, offset):
         self.scale = scale
         self.offset = offset
+        # -(x-offset)*scale as a*x + b
+        self._a = -scale
+        self._b = scale * offset
     
     def value(self, x):
-        return 1.0/(1+math.exp(-(x-self.offset)*self.scale))
+        return 1.0/(1+math.exp(self._a*x + self._b))
 
     def inverse(self, y):
 #        return math.log(y / (1 - y)) / self.scale + self.offset
@@ -28,7 +38,26 @@ class Sigmoid:
             y = EPSILON/10
         if 1.0 - y <= EPSILON/10:
             y = 1.0 -EPSILON/10
-        return (math.log(y) - math.log(1 - y)) / self.scale + self.offset
+        return (math.log(y) - math.log1p(-y)) / self.scale + self.offset
+
+    def value_vec(self, x):
+        return 1.0/(1+np.exp(self._a*x + self._b))
+
+    def value_range(self):
+        """Value over CPM_GRID, shared by all sigmoids with the same shape. Do not modify."""
+        key = (self.scale, self.offset)
+        values = Sigmoid._value_cache.get(key)
+        if values is None:
+            if len(Sigmoid._value_cache) > 256:
+                Sigmoid._value_cache.clear()
+            values = self.value_vec(CPM_GRID)
+            values.setflags(write=False)
+            Sigmoid._value_cache[key] = values
+        return values
+
+    def inverse_vec(self, y):
+        y = np.clip(y, EPSILON/10, 1.0 - EPSILON/10)
+        return (np.log(y) - np.log1p(-y)) / self.scale + self.offset
 
 #    def derivative(self, x):
 #        return self.value(x) * (1.0 - self.value(x))
@@ -42,84 +71,93 @@ class Parameters:
         self.sigmoid_B_offset = 9.0
 
     
-def update_axis(axis, p: Parameters):
+def update_axis(axis, p: Parameters, artists):
     s_A = Sigmoid(p.sigmoid_A_scale, p.sigmoid_A_offset)
     s_B = Sigmoid(p.sigmoid_B_scale, p.sigmoid_B_offset) 
 
-    l1 = []
-    l_cpm_B = []
-    l_imp_bought_A = []
-    l_imp_bought_B = []
-    l_total_cost = []
-    l_prob_A = []
-    l_prob_B = []
-    l_prob_Binv = []
-    l_prob_range = []
-    l_inv_1 = []
-    l_inv_2 = []
-    l_inv_3 = []
-
-    for cpm_input in range(0, int(MAX_CPM / STEP)):
-        cpm = 1.0 * cpm_input * STEP
-        l_prob_range.append(cpm)
-        l_prob_A.append(s_A.value(cpm))
-        l_prob_B.append(s_B.value(cpm))
+    cpm = CPM_GRID
+    l_prob_range = cpm
+    l_prob_A = s_A.value_range()
+    l_prob_B = s_B.value_range()
+
+    # at every cpm A, buy the rest of the impressions from B
+    imp_bought_A = l_prob_A
+    feasible = p.imp_to_buy - imp_bought_A <= 1.0
+    cpm_B = s_B.inverse_vec(p.imp_to_buy - imp_bought_A)
+    imp_bought_B = s_B.value_vec(cpm_B)
+    # make sure we've bought enough impressions
+    valid = feasible & (cpm_B > 0.0) & (np.fabs((imp_bought_A + imp_bought_B) - p.imp_to_buy) <= EPSILON)
+    total_cost = cpm * imp_bought_A + cpm_B * imp_bought_B # this is the function we are trying to find zero-derivate of
+
+    l1 = cpm[valid]
+    l_total_cost = total_cost[valid]
+    l_cpm_B = cpm_B[valid]
+    l_imp_bought_A = imp_bought_A[valid]
+    l_imp_bought_B = imp_bought_B[valid]
 
     min_cost = 1000.0
     min_cost_cpm_A = 0
     min_cost_cpm_B = 0
-    for cpm_input in range(0, int(MAX_CPM / STEP)):
-        cpm_A = 1.0 * cpm_input * STEP
-        imp_bought_A = s_A.value(cpm_A)
-        if p.imp_to_buy - imp_bought_A > 1.0: # impossible 
-            continue
-        cpm_B = s_B.inverse(p.imp_to_buy - imp_bought_A)
-        if cpm_B <= 0.0:
-            continue
-        imp_bought_B = s_B.value(cpm_B)
-        
-#        assert math.fabs((imp_bought_A + imp_bought_B) - imp_to_buy) < EPSILON	# make sure we've bought enough impressions
-        if math.fabs((imp_bought_A + imp_bought_B) - p.imp_to_buy) > EPSILON:	# make sure we've bought enough impressions
-            # it was impossible to buy, just fill in with empty values
-            continue
- 
-        total_cost = cpm_A * imp_bought_A + cpm_B * imp_bought_B # this is the function we are trying to find zero-derivate of
-        if total_cost < min_cost:
-            min_cost = total_cost
-            min_cost_cpm_A = cpm_A
-            min_cost_cpm_B = cpm_B
-        l1.append(cpm_A)
-        l_total_cost.append(total_cost)
-        l_cpm_B.append(cpm_B)
-        l_imp_bought_A.append(imp_bought_A)
-        l_imp_bought_B.append(imp_bought_B)
-        
-    
-
+    if l_total_cost.size > 0:
+        best = int(np.argmin(l_total_cost))
+        if l_total_cost[best] < min_cost:
+            min_cost = float(l_total_cost[best])
+            min_cost_cpm_A = float(l1[best])
+            min_cost_cpm_B = float(l_cpm_B[best])
+
+    artists['prob_A'].set_data(l_prob_range, l_prob_A)
+    artists['prob_B'].set_data(l_prob_range, l_prob_B)
+    artists['vline_prob_A'].set_segments([[(min_cost_cpm_A, 0), (min_cost_cpm_A, 1.0)]])
+    artists['vline_prob_B'].set_segments([[(min_cost_cpm_B, 0), (min_cost_cpm_B, 1.0)]])
+
+    artists['total_cost'].set_data(l1, l_total_cost)
+    artists['cpm_B'].set_data(l1, l_cpm_B)
+    artists['vline_cost'].set_segments([[(min_cost_cpm_A, 0), (min_cost_cpm_A, MAX_CPM)]])
+    artists['hline_cost'].set_segments([[(0, min_cost), (MAX_CPM, min_cost)]])
+
+    artists['imp_bought_A'].set_data(l1, l_imp_bought_A)
+    artists['imp_bought_B'].set_data(l1, l_imp_bought_B)
+    artists['vline_bought'].set_segments([[(min_cost_cpm_A, 0), (min_cost_cpm_A, p.imp_to_buy)]])
+
+    for a in (axis[0, 0], axis[1, 0], axis[0, 1]):
+        autoscale(a)
+
+
+def build_axis(axis):
+    """Create the artists update_axis() moves around, returns them by name."""
+    artists = {}
     a = axis[0, 0]
     a.set_xlim(right = MAX_CPM)
-    a.plot(l_prob_range, l_prob_A, label='Imp A probability')#, l3)#, l4, l5)
-    a.plot(l_prob_range, l_prob_B, label='Imp B probability')#, l3)#, l4, l5)
-    a.vlines(min_cost_cpm_A, 0, 1.0, colors='C0')
-    a.vlines(min_cost_cpm_B, 0, 1.0, colors='C1')
-    
-    a.legend() 
+    artists['prob_A'] = a.plot([], [], label='Imp A probability')[0]
+    artists['prob_B'] = a.plot([], [], label='Imp B probability')[0]
+    artists['vline_prob_A'] = a.vlines([], 0, 1.0, colors='C0')
+    artists['vline_prob_B'] = a.vlines([], 0, 1.0, colors='C1')
+    a.legend()
 
     a = axis[1, 0]
-    
     a.set_xlim(right = MAX_CPM)
-    a.plot(l1, l_total_cost, label='Total cost')#, l3)#, l4, l5)
-    a.plot(l1, l_cpm_B, label='Cpm B')#, l3)#, l4, l5)
-    a.vlines(min_cost_cpm_A, 0, MAX_CPM, colors='C0')
-    a.hlines(min_cost, 0, MAX_CPM, colors='C0')
+    artists['total_cost'] = a.plot([], [], label='Total cost')[0]
+    artists['cpm_B'] = a.plot([], [], label='Cpm B')[0]
+    artists['vline_cost'] = a.vlines([], 0, MAX_CPM, colors='C0')
+    artists['hline_cost'] = a.hlines([], 0, MAX_CPM, colors='C0')
     a.legend()
-   
+
     a = axis[0, 1]
     a.set_xlim(right = MAX_CPM)
-    a.plot(l1, l_imp_bought_A, label='Imp A bought')#, l3)#, l4, l5)
-    a.plot(l1, l_imp_bought_B, label='Imp B bought')#, l3)#, l4, l5)
-    a.vlines(min_cost_cpm_A, 0, p.imp_to_buy, colors='C0')
+    artists['imp_bought_A'] = a.plot([], [], label='Imp A bought')[0]
+    artists['imp_bought_B'] = a.plot([], [], label='Imp B bought')[0]
+    artists['vline_bought'] = a.vlines([], 0, 1.0, colors='C0')
     a.legend()
+    return artists
+
+
+def autoscale(a):
+    # relim() only looks at lines, the vlines/hlines collections have to be added by hand
+    a.relim()
+    for c in a.collections:
+        for segment in c.get_segments():
+            a.update_datalim(segment)
+    a.autoscale_view()
 
 
 
@@ -128,7 +166,8 @@ class Chart(FigureCanvas):
         self.fig = Figure(figsize=(5, 4), dpi=100)
         self.axis = self.fig.subplots(2, 2)
         self.p = Parameters()
-        update_axis(self.axis, self.p)
+        self.artists = build_axis(self.axis)
+        update_axis(self.axis, self.p, self.artists)
         super().__init__(self.fig)
         
         #canvas = FigureCanvas(fig)  # a Gtk.DrawingArea
@@ -136,16 +175,9 @@ class Chart(FigureCanvas):
         plt.ion()
 
     def update(self):
-        #print("updating to: ", x)
-        for i in range(0,2):
-            for j in range(0, 2):
-                self.axis[i,j].clear()
-        update_axis(self.axis, self.p)
-
-        #self.ax.draw(1)
-        #self.fig.draw()
-        self.draw()
-        #self.ion()
+        # the artists stay, only their data changes
+        update_axis(self.axis, self.p, self.artists)
+        self.draw_idle()
 
 
         
@@ -177,6 +209,8 @@ class MainWindow(Gtk.ApplicationWindow):
         
         
         self.chart = Chart()
+        self._pending = {}       # slider values waiting for the next redraw
+        self._timeout_id = None
         self.box3.append(self.chart)
         self.check = Gtk.Label(label="Parameters")
         self.box2.append(self.check)
@@ -195,10 +229,11 @@ class MainWindow(Gtk.ApplicationWindow):
         slider.set_range(start_range, end_range)
         slider.set_draw_value(True)  # Show a label with current value
         slider.set_value(start_value)  # Sets the current value/position
-        def change_function(self):
-            self.chart.p.__dict__[parameter_name] = float(slider.get_value())
-            self.chart.update()
-        slider.chart = self.chart    
+        def change_function(slider):
+            # Coalesce a burst of drag events into a single redraw
+            self._pending[parameter_name] = float(slider.get_value())
+            if self._timeout_id is None:
+                self._timeout_id = GLib.timeout_add(SLIDER_DELAY_MS, self._flush)
         slider.connect('value-changed', change_function)
         slider.set_hexpand(True)
         b = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
@@ -206,6 +241,13 @@ class MainWindow(Gtk.ApplicationWindow):
         b.append(slider)
         return b
 
+    def _flush(self):
+        self.chart.p.__dict__.update(self._pending)
+        self._pending.clear()
+        self._timeout_id = None
+        self.chart.update()
+        return GLib.SOURCE_REMOVE
+
 
 
     def slider_changed(self, slider):
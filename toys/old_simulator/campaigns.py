@@ -1,12 +1,13 @@
 import math
 import random
-import collections
-import functools
 
 from impression import ImpressionOnOffer
 from statistics import FullStat
 
 class Campaign:
+    __slots__ = ('daily_budget', 'cid', 'tags', 'type', 'hurdle', 'time_start', 'time_end', 'stat', '_single',
+                 'win_times', 'win_prices', 'diffs', 'CONFIG', 'embedding')
+
     def __init__(self, tags = [], daily_budget = None, hurdle = None, time_start = None, time_end = None):
         assert(daily_budget != None)
         self.daily_budget = daily_budget
@@ -17,6 +18,7 @@ class Campaign:
         self.time_start = time_start or 0
         self.time_end = time_end or 24 * 60 * 60
         self.stat = FullStat()
+        self._single = self.stat.single		# hot path shortcut, saves one attribute lookup per access
         self.win_times = []
         self.win_prices = []
         self.diffs = []
@@ -38,22 +40,20 @@ class Campaign:
     def register_click(self, ioo: ImpressionOnOffer, ):
         self.stat.register_click(ioo)
         
+    def format_line(self) -> str:
+        single = self._single
+        return (f"CID: {self.cid}, Type: {self.type}, Tags: {self.tags}, impressions: {single.impressions}, clicks: {single.clicks}, "
+                f"spend: {single.spend:2.2f}, cpc: {single.cpc:2.3f}, cpm: {single.cpm:2.3f}, h: {self.hurdle:2.2f}")
+
     def print_line_stat(self):
-        print("CID: %i, Type: %s, Tags: %s, impressions: %i, clicks: %i, spend: %2.2f, cpc: %2.3f, cpm: %2.3f, h: %2.2f" % 
-            (self.cid, 
-            self.type, 
-            str(self.tags), 
-            self.stat.single.impressions, 
-            self.stat.single.clicks, 
-            self.stat.single.spend, 
-            self.stat.single.spend / self.stat.single.clicks if self.stat.single.clicks else 0.0,
-            1000.0 * self.stat.single.spend / self.stat.single.impressions if self.stat.single.impressions else 0.0,
-            self.hurdle))
+        print(self.format_line())
         
         
         
         
 class CampaignStaticCPC(Campaign):
+    __slots__ = ('fixed_cpc',)
+
     def __init__(self, tags = [], cpc = None, daily_budget = None, hurdle = None, time_start = None, time_end = None):
         Campaign.__init__(self, tags = tags, daily_budget = daily_budget, hurdle = hurdle, time_start = time_start, time_end = time_end)
         assert(cpc != None)
@@ -63,7 +63,7 @@ class CampaignStaticCPC(Campaign):
         self.type = "StaticCPC"
         
     def get_bid(self, ioo: ImpressionOnOffer) -> float:
-        if self.stat.single.spend >= self.daily_budget:
+        if self._single.spend >= self.daily_budget:
             return None
         if ioo.time_s < self.time_start or ioo.time_s > self.time_end:
             return None
@@ -73,6 +73,8 @@ class CampaignStaticCPC(Campaign):
 
 
 class CampaignThrottledStaticCPC(Campaign):
+    __slots__ = ('fixed_cpc',)
+
     def __init__(self, tags = [], cpc = None, daily_budget = None, hurdle = None, time_start = None, time_end = None):
         Campaign.__init__(self, tags = tags, daily_budget = daily_budget, hurdle = hurdle, time_start = time_start, time_end = time_end)
         assert(cpc != None)
@@ -82,14 +84,14 @@ class CampaignThrottledStaticCPC(Campaign):
         self.type = "ThrottledStaticCPC"
         
     def get_bid(self, ioo: ImpressionOnOffer) -> float:
-        if self.stat.single.spend >= self.daily_budget:
+        if self._single.spend >= self.daily_budget:
             return None
         if ioo.time_s < self.time_start or ioo.time_s >= self.time_end:
             return None
         
         expected_spend = self.daily_budget * (ioo.time_s - self.time_start) / (self.time_end - self.time_start)
 #        print(expected_spend)
-        if self.stat.single.spend >= expected_spend:
+        if self._single.spend >= expected_spend:
             return None
         
         
@@ -97,7 +99,21 @@ class CampaignThrottledStaticCPC(Campaign):
 
 SLOW_T = 10000
 FAST_T = 100
+_INV_SLOW_T = 1.0 / SLOW_T
+_INV_FAST_T = 1.0 / FAST_T
+# EMA retention factors exp(-dt/T) for both pacing averages
+# _exp is bound at definition time to skip the global + attribute lookup
+def retention_factors(p_time_diff, _exp = math.exp):
+    return _exp(-p_time_diff * _INV_SLOW_T), _exp(-p_time_diff * _INV_FAST_T)
+
+# one step of both pacing EMAs towards the observed spend rate, decay = 1 - retention
+def pacing_update(slow, fast, rate, decay_slow, decay_fast):
+    return slow + decay_slow * (rate - slow), fast + decay_fast * (rate - fast)
+
 class CampaignPacedMinCPC(Campaign):
+    __slots__ = ('output_price', 'exp_avg_pace_slow', 'exp_avg_pace_fast', 'exp_diff', 'exp_abs_diff',
+                 'last_win_time', 'last_bid_time')
+
     def __init__(self, tags = [], daily_budget = None, hurdle = None, time_start = None, time_end = None):
         Campaign.__init__(self, tags = tags, daily_budget = daily_budget, hurdle = hurdle, time_start = time_start, time_end = time_end)
         assert(daily_budget != None)
@@ -113,7 +129,7 @@ class CampaignPacedMinCPC(Campaign):
         
         
     def get_bid(self, ioo: ImpressionOnOffer) -> float:
-        if self.stat.single.spend >= self.daily_budget:
+        if self._single.spend >= self.daily_budget:
             return None
         if ioo.time_s < self.time_start or ioo.time_s >= self.time_end:
             return None
@@ -121,8 +137,8 @@ class CampaignPacedMinCPC(Campaign):
             self.last_bid_time = ioo.time_s
             return self.output_price        
         remaining_time = self.time_end - ioo.time_s
-        remaining_spend = self.daily_budget - self.stat.single.spend
-        assert(remaining_time > 0.0)
+        remaining_spend = self.daily_budget - self._single.spend
+        # remaining_time > 0.0, the time window check above rejects time_s >= time_end
         remaining_desired_pace = remaining_spend / remaining_time
         
         
@@ -135,12 +151,14 @@ class CampaignPacedMinCPC(Campaign):
             self.exp_avg_pace_fast = remaining_desired_pace
             self.exp_avg_pace_slow = remaining_desired_pace
 
-        exp_avg_pace_slow = self.exp_avg_pace_slow + (1.0 - math.exp(-p_time_diff/SLOW_T)) * (- self.exp_avg_pace_slow)
-        exp_avg_pace_fast = self.exp_avg_pace_fast + (1.0 - math.exp(-p_time_diff/FAST_T)) * (- self.exp_avg_pace_fast)
+        # no spend since the last win, so the EMAs just decay
+        retain_slow, retain_fast = retention_factors(p_time_diff)
+        exp_avg_pace_slow = self.exp_avg_pace_slow * retain_slow
+        exp_avg_pace_fast = self.exp_avg_pace_fast * retain_fast
 
         if exp_avg_pace_slow < remaining_desired_pace:# and exp_avg_pace_fast < remaining_desired_pace:
 #            print(ioo.iid)
-            proportional = (remaining_desired_pace / exp_avg_pace_slow - 1.0) / 1.0 + 1.0
+            proportional = remaining_desired_pace / exp_avg_pace_slow
             proportional = min(2, max(0.1, proportional))
             self.output_price = self.output_price * proportional
 #            print("IMP UP iid: %i, Expected avg: %2.5f Slow avg: %2.5f, fast avg: %2.4f, price: %2.4f" % (ioo.iid, remaining_desired_pace, exp_avg_pace_slow, exp_avg_pace_fast, self.output_price))
@@ -155,9 +173,14 @@ class CampaignPacedMinCPC(Campaign):
 
     def register_impression(self, ioo: ImpressionOnOffer, price: float):
         Campaign.register_impression(self, ioo, price)
+        p_time_diff = ioo.time_s - self.last_win_time
+        if p_time_diff <= 0.0:
+            # another win at the same timestamp: no time has passed, so the EMAs can't move (and price/p_time_diff is undefined)
+            self.diffs.append(self.exp_abs_diff)
+            return
         remaining_time = self.time_end - ioo.time_s
-        remaining_spend = self.daily_budget - self.stat.single.spend
-        assert(remaining_time > 0.0)
+        remaining_spend = self.daily_budget - self._single.spend
+        # remaining_time > 0.0, we only win impressions that get_bid accepted
         remaining_desired_pace = remaining_spend / remaining_time
 
         if self.last_win_time < 0.0:
@@ -169,19 +192,18 @@ class CampaignPacedMinCPC(Campaign):
             #print("INITIAL Exp avg pace: %2.5f" % (self.exp_avg_pace * 1000))
             
         # on win, we possibly want to decrease output_price
-        p_time_diff = ioo.time_s - self.last_win_time
-        self.exp_avg_pace_slow += (1.0 - math.exp(-p_time_diff/SLOW_T)) * ((price/p_time_diff) - self.exp_avg_pace_slow)
-        self.exp_avg_pace_fast += (1.0 - math.exp(-p_time_diff/FAST_T)) * ((price/p_time_diff) - self.exp_avg_pace_fast)
+        retain_slow, retain_fast = retention_factors(p_time_diff)
+        decay_slow, decay_fast = 1.0 - retain_slow, 1.0 - retain_fast
+        self.exp_avg_pace_slow, self.exp_avg_pace_fast = pacing_update(self.exp_avg_pace_slow, self.exp_avg_pace_fast, price/p_time_diff, decay_slow, decay_fast)
         #print("Exp avg pace: %2.5f" % (self.exp_avg_pace * 1000))
         diff = self.exp_avg_pace_slow - remaining_desired_pace
-        self.exp_diff += (1.0 - math.exp(-p_time_diff/FAST_T)) * ((diff) - self.exp_diff)
-        self.exp_abs_diff += (1.0 - math.exp(-p_time_diff/FAST_T)) * ((math.fabs(diff)) - self.exp_abs_diff) 
+        self.exp_diff += decay_fast * ((diff) - self.exp_diff)
+        self.exp_abs_diff += decay_fast * ((math.fabs(diff)) - self.exp_abs_diff) 
 #        print (ioo.iid, self.exp_abs_diff, self.exp_diff)
         self.diffs.append(self.exp_abs_diff)       
         
-        proportional_base = remaining_desired_pace / self.exp_avg_pace_slow
         if self.exp_avg_pace_slow > remaining_desired_pace:
-            proportional = ((proportional_base - 1.0)) + 1.0
+            proportional = remaining_desired_pace / self.exp_avg_pace_slow
             proportional = min(2, max(0.1, proportional))
             self.output_price = self.output_price * proportional
  #           print("WIN DROP iid: %i, Expected avg: %2.4f Slow avg: %2.4f, fast avg: %2.4f, proportional: %2.4f, next price: %2.4f " % (ioo.iid, remaining_desired_pace, self.exp_avg_pace_slow, self.exp_avg_pace_fast, proportional, self.output_price))
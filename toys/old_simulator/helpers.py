@@ -1,7 +1,11 @@
 import math
+import numpy as np
 
 def sigmoid(x):
-    return 1/(1+(math.exp((-x))))    
+    return 1.0/(1.0+math.exp(-x))
 
 def inverse_sigmoid(x):
-    return math.log(x / (1.0 - x))
+    return math.log(x) - math.log1p(-x)
+
+def sigmoid_vec(x):
+    return 1.0/(1.0+np.exp(-x))
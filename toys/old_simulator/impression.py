@@ -1,20 +1,26 @@
     
-import random
-from helpers import sigmoid
+from helpers import sigmoid_vec
         
 class ImpressionOnOffer:
-    def __init__(self, iid: int, time_s: float, config):
+    __slots__ = ('iid', 'time_s', 'embedding', 'impression_ctr', '_clicked')
+
+    def __init__(self, iid: int, time_s: float, embedding, impression_ctr: float, clicked: bool):
         self.iid = iid
         self.time_s = time_s 
-        self.embedding = config.rng.normal(loc = 0.0, scale = 0.1, size = len(config.campaign_base_embedding))
-        self.impression_ctr = sigmoid(self.embedding.dot(config.campaign_base_embedding) + config.base_intercept)
-#        self.impression_ctr = config.BASE_CTR * (1 + - config.BASE_CTR_JITTER_PERCENT + random.uniform(0.0, config.BASE_CTR_JITTER_PERCENT * 2))          # HERE IT IS PCTR, not CTR
-#        self.impression_ctr = config.BASE_CTR #* (1 + - config.BASE_CTR_JITTER_PERCENT + random.uniform(0.0, config.BASE_CTR_JITTER_PERCENT * 2))          # HERE IT IS PCTR, not CTR
-        
-        # we just make it up if there was a click or not - ahead of time
-        self._clicked = random.uniform(0.0, 1.0) < self.impression_ctr * (1.0 - config.BASE_CTR_JITTER_PERCENT + random.uniform(0.0, config.BASE_CTR_JITTER_PERCENT * 2))          # HERE IT IS PCTR, not CTR
-        
+        self.embedding = embedding
+        self.impression_ctr = impression_ctr
+        self._clicked = clicked
 
     def has_been_clicked(self) -> bool:
         return self._clicked        
 
+
+def draw_impressions(n: int, config):
+    """Embeddings, ctrs and clicks of the next n impressions, row i is impression i."""
+    embeddings = config.rng.normal(loc = 0.0, scale = 0.1, size = (n, len(config.campaign_base_embedding)))
+    ctrs = sigmoid_vec(embeddings @ config.campaign_base_embedding + config.base_intercept)
+
+    # we just make it up if there was a click or not - ahead of time
+    jitter = config.BASE_CTR_JITTER_PERCENT
+    clicked = config.rng.random(n) < ctrs * (1.0 - jitter + config.rng.uniform(0.0, jitter * 2, size = n))          # HERE IT IS PCTR, not CTR
+    return embeddings, ctrs.tolist(), clicked.tolist()
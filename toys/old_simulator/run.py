@@ -1,16 +1,14 @@
-import random
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
-import math
-
 from campaigns import 	Campaign, \
                         CampaignStaticCPC, \
                         CampaignThrottledStaticCPC, \
                         CampaignPacedMinCPC
-from impression import ImpressionOnOffer    
+from impression import ImpressionOnOffer, draw_impressions
 from statistics import FullStat
-from helpers import sigmoid, inverse_sigmoid
+from helpers import sigmoid_vec, inverse_sigmoid
         
 class CONFIG:
     IMPRESSIONS = 100000
@@ -25,8 +23,9 @@ class Simulation:
     def __init__(self, config):
         self.stat = FullStat()
         self.cs : list[Campaign] = []
+        self.live_cids : list[int] = []	# campaigns with budget left, in cid order
         self.CONFIG = config
-        self.CONFIG.rng = np.random.default_rng(seed = 11)
+        self.CONFIG.rng = np.random.default_rng(seed = 11)	# get deterministic behavior
         # we want campaigns to have correlated embeddings, so they fight for the same impressions
         self.CONFIG.campaign_base_embedding = self.CONFIG.rng.normal(loc = 0.0, scale =  1, size = self.CONFIG.CAMPAIGN_EMBEDDING_SIZE)
         # we want to have base CTR set. 
@@ -36,30 +35,34 @@ class Simulation:
         self.got_fractional_clicks = 0.0
             
     def run_one_auction(self, iid, time_s):
-        ioo = ImpressionOnOffer(iid, time_s, self.CONFIG)
-        # get highest bid
-        bids = []
-        max_ctr = 0.0
-        for c in self.cs:
+        ioo = ImpressionOnOffer(iid, time_s, self.embeddings[iid], self.ctrs[iid], self.clicked[iid])
+        actual_ctr = self.actual_ctrs[iid]
+        max_ctr = self.max_ctrs[iid]
+        # get highest hurdle-aware bid, and the runner-up for second price
+        win_c = None
+        second_score = None
+        for cid in self.live_cids:
+            c = self.cs[cid]
             bid = c.get_bid(ioo)
-            actual_ctr = sigmoid(ioo.embedding.dot(c.embedding) + self.CONFIG.base_intercept)
-            max_ctr = max(actual_ctr, max_ctr)
             if bid:
-                bids.append((c, bid, bid * c.hurdle, actual_ctr))
+                score = bid * c.hurdle
+                if win_c is None or score > win_score:		# ties go to the lower cid
+                    if win_c is not None:
+                        second_score = win_score
+                    win_c, win_bid, win_score = c, bid, score
+                elif second_score is None or score > second_score:
+                    second_score = score
         self.max_fractional_clicks += max_ctr
         
-        bids.sort(key=lambda t: t[2], reverse = True) 		# sort by hurdle-aware bids
-        if len(bids) > 0:
-            win_c = bids[0][0]
-            if self.CONFIG.SECOND_PRICE:
-                if len(bids) > 1:
-                    win_bid = bids[1][2] / win_c.hurdle		# adjust for the hurdle  
-                else: # a single bidder, what do we do?
-                    win_bid = bids[0][1]	# let's do the first price
-            else:
-                win_bid = bids[0][1]	# simple first price
+        if win_c is not None:
+            if self.CONFIG.SECOND_PRICE and second_score is not None:
+                win_bid = second_score / win_c.hurdle		# adjust for the hurdle  
+            # otherwise simple first price, or a single bidder which also pays its own bid
             self.got_fractional_clicks += actual_ctr
             win_c.register_impression(ioo, win_bid)
+            if win_c._single.spend >= win_c.daily_budget:
+                # exhausted campaigns never bid again, stop asking them
+                self.live_cids.remove(win_c.cid)
             self.stat.register_impression(ioo, win_bid)
             self.stat_per_ctype[win_c.type].register_impression(ioo, win_bid)
             return True
@@ -74,6 +77,13 @@ class Simulation:
             cs.embedding = self.CONFIG.campaign_base_embedding + self.CONFIG.rng.normal(loc = 0.0, scale = 0.1, size = self.CONFIG.CAMPAIGN_EMBEDDING_SIZE)
 #            print(cs.embedding)
         self.stat_per_ctype = {ctype:FullStat() for ctype in campaign_types}
+        # all impressions are drawn up front, run_one_auction picks row iid
+        self.embeddings, self.ctrs, self.clicked = draw_impressions(self.CONFIG.IMPRESSIONS, self.CONFIG)
+        # clicks regret assumes unlimited budgets, so ctrs are needed for exhausted campaigns too
+        campaign_embeddings = np.stack([c.embedding for c in self.cs])
+        self.campaign_ctrs = sigmoid_vec(self.embeddings @ campaign_embeddings.T + self.CONFIG.base_intercept)
+        self.actual_ctrs = self.campaign_ctrs[:, -1].tolist()
+        self.max_ctrs = self.campaign_ctrs.max(axis = 1).tolist()
         for iid in range(self.CONFIG.IMPRESSIONS):
             time_s = 24*60*60 *iid / self.CONFIG.IMPRESSIONS  # linear time, for now
             self.run_one_auction(iid, time_s)
@@ -81,11 +91,11 @@ class Simulation:
     def add_campaign(self, c: Campaign):
         c.set_config(self.CONFIG)
         c.set_cid(len(self.cs))
+        self.live_cids.append(c.cid)
         self.cs.append(c)
         
     def print_stats(self):
-        for c in self.cs:
-            c.print_line_stat()
+        sys.stdout.write("".join(c.format_line() + "\n" for c in self.cs))
         print ("TOTAL -- Impressions: %i, Clicks: %i, Spend: %2.2f" % (self.stat.single.impressions, self.stat.single.clicks, self.stat.single.spend))
         print("Total spend by hour:")
         
@@ -106,7 +116,6 @@ class Simulation:
 
 def main():
 
-    random.seed(10) # get deterministic behavior
     s = Simulation(CONFIG)
     s.add_campaign(CampaignStaticCPC(cpc = 0.05, daily_budget = 100000, hurdle = 1.0)) # unlimited budget back-stop campaign
     s.add_campaign(CampaignStaticCPC(cpc = 0.1, daily_budget = 200, hurdle = 1.0))
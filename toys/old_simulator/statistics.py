@@ -1,10 +1,13 @@
 import asciichartpy as acp
 import random
 import math
+import numpy as np
 from impression import ImpressionOnOffer
 
 
 class IndividualStat:
+    __slots__ = ('impressions', 'spend', 'clicks')
+
     def __init__(self):
         self.impressions = 0
         self.spend = 0.0
@@ -17,35 +20,65 @@ class IndividualStat:
     def register_click(self):
         self.clicks += 1
 
+    @property
+    def cpc(self):
+        return self.spend / self.clicks if self.clicks else 0.0
+
+    @property
+    def cpm(self):
+        return 1000.0 * self.spend / self.impressions if self.impressions else 0.0
+
 
 class FullStat:
     def __init__(self):
         self.single = IndividualStat()
-        self.hours = [IndividualStat() for x in range(24)]
+        # hourly totals, one element per hour of the day
+        self.hour_spend = np.zeros(24)
+        self.hour_impressions = np.zeros(24, dtype = int)
+        self.hour_clicks = np.zeros(24, dtype = int)
         self.cpm_stat = RunningStats()
+        # per-impression log, folded into the hourly totals and cpm_stat by rollup() when they are needed
+        self._times = []
+        self._prices = []
+        self._clicks = []
         
     def register_impression(self, ioo: ImpressionOnOffer, price: float): 
-        hour = int(ioo.time_s / 60 / 60)
+        # only the running totals are kept up to date, bidders read them while the day is running
         self.single.register_impression(price)
-        self.hours[hour].register_impression(price)
-        self.cpm_stat.push(price)
         if ioo._clicked: 
             self.single.register_click()
-            self.hours[hour].register_click()
+        self._times.append(ioo.time_s)
+        self._prices.append(price)
+        self._clicks.append(ioo._clicked)
+
+    def rollup(self):
+        if not self._prices:
+            return
+        hours = (np.array(self._times) / 60 / 60).astype(int)
+        # anything past the end of the day is left out, as before
+        self.hour_spend += np.bincount(hours, weights = self._prices, minlength = 24)[:24]
+        self.hour_impressions += np.bincount(hours, minlength = 24)[:24]
+        self.hour_clicks += np.bincount(hours, weights = self._clicks, minlength = 24)[:24].astype(int)
+        self.cpm_stat.push_all(self._prices)
+        self._times.clear()
+        self._prices.clear()
+        self._clicks.clear()
 
     def draw_hourly_spend(self):
-        x =  [stat.spend for stat in self.hours]
+        self.rollup()
+        x = self.hour_spend.tolist()
         print(acp.plot(x, {'height': 10}))
 
     def draw_hourly_cpm(self):
+        self.rollup()
         print("CPM Standard Deviation: %2.5f" % self.cpm_stat.standard_deviation())
-        x =  [1000.0*stat.spend/ stat.impressions if stat.clicks else 0 for stat in self.hours]
+        x = np.where(self.hour_clicks > 0, 1000.0*self.hour_spend / np.maximum(self.hour_impressions, 1), 0.0).tolist()
 #        print (x)
         print(acp.plot(x, {'height': 10}))
 
     def draw_hourly_cpc(self):
-        
-        x =  [stat.spend / stat.clicks if stat.clicks else 0 for stat in self.hours]
+        self.rollup()
+        x = np.where(self.hour_clicks > 0, self.hour_spend / np.maximum(self.hour_clicks, 1), 0.0).tolist()
 #        print (x)
         print(acp.plot(x, {'height': 10}))
 
@@ -77,6 +110,26 @@ class RunningStats:
             self.old_m = self.new_m
             self.old_s = self.new_s
 
+    def push_all(self, xs):
+        # push() of every value at once, merged in with Chan et al.'s pairwise update
+        xs = np.asarray(xs, dtype = float)
+        if xs.size == 0:
+            return
+        m = float(xs.mean())
+        s = float(((xs - m) ** 2).sum())
+        if self.n == 0:
+            self.n = xs.size
+            self.old_m = self.new_m = m
+            self.old_s = self.new_s = s
+            return
+        n = self.n + xs.size
+        delta = m - self.new_m
+        self.new_m = self.new_m + delta * xs.size / n
+        self.new_s = self.new_s + s + delta * delta * self.n * xs.size / n
+        self.old_m = self.new_m
+        self.old_s = self.new_s
+        self.n = n
+
     def mean(self):
         return self.new_m if self.n else 0.0
 